@@ -1,15 +1,31 @@
 import pygame
-from random import randint
+from random import Random
+from time import perf_counter
 import os
 from typing import Union
 import sys
+
+# Mixer buffer size in samples (kept small for a low flap/point latency, can be raised to 4096 on platforms where the audio pops)
+AUDIO_BUFFER = 512
+# Audio is disabled when the FLAPPY_MUTE environment variable is set (to any non-empty value)
+MUTED = bool(os.environ.get('FLAPPY_MUTE'))
+
+# The mixer has to be configured before pygame.init() initializes it
+if not MUTED:
+    pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=AUDIO_BUFFER)
 pygame.init()
+# pygame.init() starts the mixer as well, so when muted it is shut down again and does not keep running in the background
+if MUTED:
+    pygame.mixer.quit()
 
 # Global Constants (Can be altered to change game difficulty/ adaptability)
 
 #* GENERAL CONSTANTS
 WIDTH, HEIGHT = 576, 1024 # Screen Width and height
 FPS = 60 # Frames Per Second (Used to set clock tick)
+FIXED_DT = 1 / FPS # Duration (in seconds) of one simulation step, the speeds and gravity below are applied once per step
+MAX_FRAME_TIME = 0.1 # Maximum time (in seconds) simulated per rendered frame, so a slow frame cannot snowball into more and more steps
+SNAP_TOLERANCE = 0.002 # A frame lasting within this much time (in seconds) of a whole number of steps is counted as exactly that many steps, so frames timed in whole milliseconds do not skip or double steps
 
 #* BIRD CONSTANTS
 GRAVITY = 0.3 # Gravity of the free falling bird
@@ -17,17 +33,66 @@ FLAP_POWER = 6 # Y-axis velocity of the bird (Negative implying the bird will mo
 ROTATION_SPEED = 0.05 # Rotation angle of the bird 
 #* PIPE CONSTANTS
 PIPE_GAP = 250 # Space between pipes (altered depending on difficulty)
+GAP_START_END = HEIGHT - PIPE_GAP - 224 - 50 + 1 # Exclusive upper bound of the random y-position of the gap (updated with PIPE_GAP)
 PIPE_THICKNESS = 104 # Thickness of pipe
 PIPE_SPEED = 4 # horizontal speed of pipe
 
 #* FLOOR CONSTANTS  
 FLOOR_SPEED = 4 # Horizontal speed of the floor
 
+
+class _SilentSound:
+    """
+    A stand-in for the pygame Sounds and Channels when the game is muted, so that playing audio needs no check.
+    """
+    def play(self,*args) -> None:
+        pass
+
+
 #* FONT AND AUDIO
 FONT = pygame.font.Font('font/arcade.TTF',70)
-POINT_SOUND = pygame.mixer.Sound(os.path.join('audio', 'point.wav'))
-FLAP_SOUND = pygame.mixer.Sound(os.path.join('audio','wing.wav'))
-HIT_SOUND = pygame.mixer.Sound(os.path.join('audio','hit.wav'))
+if MUTED:
+    POINT_SOUND = FLAP_SOUND = HIT_SOUND = FLAP_CHANNEL = POINT_CHANNEL = _SilentSound()
+else:
+    POINT_SOUND = pygame.mixer.Sound(os.path.join('audio', 'point.wav'))
+    FLAP_SOUND = pygame.mixer.Sound(os.path.join('audio','wing.wav'))
+    HIT_SOUND = pygame.mixer.Sound(os.path.join('audio','hit.wav'))
+    # Flap and point chimes get their own reserved channel, so playing them needs no search for a free channel
+    pygame.mixer.set_reserved(2)
+    FLAP_CHANNEL = pygame.mixer.Channel(0)
+    POINT_CHANNEL = pygame.mixer.Channel(1)
+
+#* RANDOM NUMBER GENERATOR (randrange bound once, used for the y-position of the pipe gaps)
+_rng_randrange = Random().randrange
+
+#* SPRITE SURFACES (loaded once by load_sprites(), after the display mode is set)
+BIRD_SURFS = None # Bird animation frames
+PIPE_SURFS = None # Top and bottom pipe
+FLOOR_SURF = None # Floor (2 back to back base images, pre-composed into a single strip)
+GAMEOVER_SURF = None # Game over message
+
+
+def load_sprites() -> None:
+    """
+    Loads, converts and scales every sprite image a single time, so that sprites can share the surfaces instead of loading them again.
+    Has to be called after pygame.display.set_mode(), since convert_alpha() needs a display format.
+
+    Parameters
+    ----------
+        None
+        
+    Returns
+    -------
+        None
+    """
+    global BIRD_SURFS, PIPE_SURFS, FLOOR_SURF, GAMEOVER_SURF
+    BIRD_SURFS = [pygame.transform.scale2x(pygame.image.load(p).convert_alpha()) for p in ('sprites/yellowbird-upflap.png','sprites/yellowbird-midflap.png','sprites/yellowbird-downflap.png')]
+    PIPE_SURFS = [pygame.transform.scale2x(pygame.image.load(p).convert_alpha()) for p in ('sprites/pipe-top.png','sprites/pipe-bottom.png')]
+    base = pygame.transform.scale2x(pygame.image.load('sprites/base.png').convert_alpha())
+    FLOOR_SURF = pygame.Surface((WIDTH + base.get_width(),base.get_height()),pygame.SRCALPHA).convert_alpha()
+    FLOOR_SURF.blit(base,(0,0))
+    FLOOR_SURF.blit(base,(WIDTH,0))
+    GAMEOVER_SURF = pygame.transform.scale2x(pygame.image.load('sprites/gameover.png').convert_alpha())
 
 
 class Sprite:
@@ -46,14 +111,18 @@ class Sprite:
             - x-axis position of the sprite
         y : int
             - y-axis position of the sprite
-        image : str or list
-            - path of the image to be rendered on-screen
-                str -> single image to be rendered
-                list -> animation to be rendered (list of images)
+        image : pygame.Surface or list
+            - image to be rendered on-screen (preloaded by load_sprites())
+                pygame.Surface -> single image to be rendered
+                list -> animation to be rendered (list of surfaces)
         height : int
             - height of the sprite
         width : int
             - width of the sprite
+        half_w : float
+            - half of the width of the sprite (used for collision checks)
+        half_h : float
+            - half of the height of the sprite (used for collision checks)
 
     Methods
     -------
@@ -63,10 +132,16 @@ class Sprite:
         
         render(self):
             Deals with rendering (displaying) the sprite on-screen
+        
+        draw_list(self):
+            Returns the surfaces (and their positions) that make up the sprite, so they can be blitted in a single batch
     """
     
+    # Instance attributes are stored in slots (no per-instance __dict__), here and in every subclass
+    __slots__ = ('x','y','image','height','width','half_w','half_h')
+    
     # Initialization
-    def __init__(self,x: float,y: float,image: Union[str,list]) -> None:
+    def __init__(self,x: float,y: float,image: Union[pygame.Surface,list],size: tuple) -> None:
         """
         Constructs all the necessary attributes for the sprite object.
 
@@ -76,23 +151,21 @@ class Sprite:
                 - x-axis position of the sprite
             y : int
                 - y-axis position of the sprite
-            image : str or list
-                - path of the image to be rendered on-screen
-                    str -> single image to be rendered
-                    list -> animation to be rendered (list of images)
+            image : pygame.Surface or list
+                - image to be rendered on-screen (preloaded by load_sprites())
+                    pygame.Surface -> single image to be rendered
+                    list -> animation to be rendered (list of surfaces)
+            size : tuple
+                - (width, height) of the sprite, measured by the subclass from the surface that gives its size
         """
         self.x = x
         self.y = y
-        # Here when the image passed is a list, every image in the list is converted to a pygame surface and maintained as a list,
-        # If only a single image is passed, it is stored as a single Pygame Surface.
-        if type(image) == list:
-            self.image = [pygame.transform.scale2x(pygame.image.load(animation).convert_alpha()) for animation in image]
-            self.height = self.image[0].get_height()
-            self.width = self.image[0].get_width()
-        else:
-            self.image = pygame.transform.scale2x(pygame.image.load(image).convert_alpha())
-            self.height = self.image.get_height()
-            self.width = self.image.get_width()
+        # The surfaces are already loaded, converted and scaled, so they are shared as is
+        self.image = image
+        self.width, self.height = size
+        # Half-extents are precomputed once, as they are needed for every collision check
+        self.half_w = self.width * 0.5
+        self.half_h = self.height * 0.5
        
     # Methods
      
@@ -123,7 +196,21 @@ class Sprite:
         -------
             None
         """
-        pass
+        screen.blits(self.draw_list(),False)
+    
+    def draw_list(self) -> list:
+        """
+        Lists the surfaces to be displayed for the Sprite, along with their on-screen positions
+        
+        Parameters
+        ----------
+            None
+            
+        Returns
+        -------
+            list of (pygame surface, position) tuples
+        """
+        return []
 
 class Bird(Sprite):
     """
@@ -133,10 +220,14 @@ class Bird(Sprite):
     
     Class Attributes
     ----------------
-        last_update: int
-            - stores the tick value of pygame for when the bird was intialized. This is used later for animating the bird.
+        _tick_accum: int
+            - counts the frames rendered since the last animation update of the bird. This is used for animating the bird.
         frame: int
             - represents the frame of the animation to be displayed (here takes values (0,1 or 2) that represent index of the animation list)
+        len_frames: int
+            - number of images in the animation list of the bird
+        frame_ticks: int
+            - number of rendered frames each animation frame is displayed for (~100ms)
             
     Instance Attributes
     -------------------
@@ -153,27 +244,37 @@ class Bird(Sprite):
                 
             rotation : float
                 - the angle of rotation of the bird sprite
+                
+            _rot_cache : list
+                - pre-rotated surfaces of every animation frame (one per degree from -90 to 90), indexed as [frame][angle + 90]
     Methods
     -------
     
         motion(self):
             Deals with constant movement of the bird on-screen.
 
-        render(self):
+        draw_list(self):
             Deals with rendering (displaying) the bird on-screen
         
         flap(self):
             Handles flapping of the bird (up movement of the bird when a key is pressed by user)
+        
+        reset(self,x,y):
+            Moves the bird back to the given position, stationary and unrotated
             
-        collision(self,floor,pipe):
+        collision(self,floor,pipes):
             Handles collision detection of the bird with the floor/pipes.
     """
+    __slots__ = ('vely','started','degree','rotation','_rot_cache')
+    
     # Class Attributes
-    last_update = pygame.time.get_ticks()
+    _tick_accum = 0
     frame = 0
+    len_frames = 3
+    frame_ticks = FPS // 10
     
     # Initialization
-    def __init__(self,x: float,y: float,image: Union[str,list]) -> None:
+    def __init__(self,x: float,y: float,image: Union[pygame.Surface,list]) -> None:
         """
         Constructs all the necessary attributes for the bird object.
 
@@ -182,63 +283,95 @@ class Bird(Sprite):
             Inherits x, y and image (height,width) from the Sprite Class (Parent)
             
         """
-        Sprite.__init__(self,x,y,image)
+        # The size of the bird is the size of its first animation frame
+        Sprite.__init__(self,x,y,image,image[0].get_size())
         self.vely = 0
         self.started = False
         self.degree = 0
         self.rotation = 0
+        
+        # Every animation frame is rotated once for each whole degree in [-90, 90], so that rendering only needs to pick a surface
+        self._rot_cache = [[pygame.transform.rotate(img,angle).convert_alpha() for angle in range(-90,91)] for img in self.image]
    
     # Methods
     
-    def motion(self) -> None:
+    def motion(self,_gravity: float = GRAVITY,_rotation_speed: float = ROTATION_SPEED) -> None:
         """
         Handles constant motion of the bird, i.e. constant increase in y-axis position (downwards) due to gravity
 
         Parameters
         ----------
-            None
+            _gravity, _rotation_speed : float
+                - GRAVITY and ROTATION_SPEED bound as locals (not meant to be passed)
             
         Returns
         -------
             None
         """
         
+        # The physics step is done on local floats and written back once, instead of re-reading attributes for every operation
+        vely = self.vely + _gravity
+        degree = self.degree + _rotation_speed
+        
         # Increase in y velocity and y position of the bird
-        self.vely += GRAVITY
-        self.y += self.vely
+        self.vely = vely
+        self.y += vely
         
         # Increase in angle of rotation of the bird, until 90 (animation effect)
-        self.degree += ROTATION_SPEED   
-        if self.rotation >= -90:
-            self.rotation -= self.degree
+        self.degree = degree
+        rotation = self.rotation
+        if rotation >= -90:
+            self.rotation = rotation - degree
         
-    def render(self,screen) -> None:
+    def draw_list(self) -> list:
         """
-        Displays the bird on-screen.
+        Lists the surface to display the bird on-screen, advancing its animation.
 
         Parameters
         ----------
-            - screen : pygame screen 
+            None
             
         Returns
         -------
-            None
+            list of (pygame surface, position) tuples
         """
         
-        # Accessing current tick and checking if 100 ticks has passed since the last update of the bird. 
-        # If true, the next frame (animation) of the bird is displayed
-        current_time = pygame.time.get_ticks()
+        # Counting rendered frames and checking if ~100ms (frame_ticks frames) has passed since the last update of the bird. 
+        # If true, the next frame (animation) of the bird is displayed, set back to 0 when end of the list is reached
+        Bird._tick_accum += 1
+        if Bird._tick_accum >= Bird.frame_ticks:
+            Bird.frame = (Bird.frame + 1) % Bird.len_frames
+            Bird._tick_accum = 0
+                
+        # If the bird is stationary (welcome screen), it is never rotated, so its image is rendered directly
+        if not self.started:
+            return [(self.image[Bird.frame],(self.x,self.y))]
+        
+        # Bird is rendered on-screen, using the pre-rotated surface closest to the current angle of rotation (rounded to the nearest degree)
+        idx = max(-90, min(90, round(self.rotation))) + 90
+        return [(self._rot_cache[Bird.frame][idx],(self.x,self.y))]
+    
+    def reset(self,x: float,y: float) -> None:
+        """
+        Moves the bird back to the given position and sets it stationary, allowing the bird object to be reused on restart
         
-        if current_time - Bird.last_update >= 100:
-            Bird.frame += 1
-            Bird.last_update = current_time
+        Parameters
+        ----------
+            x : int
+                - x-axis position of the bird
+            y : int
+                - y-axis position of the bird
             
-            # Frame set back to 0 when end of the list is reached
-            if Bird.frame >= len(self.image):
-                Bird.frame = 0
-                
-        # Bird is rendered on-screen
-        screen.blit(pygame.transform.rotate(self.image[Bird.frame],self.rotation),(self.x,self.y))
+        Returns
+        -------
+            None
+        """
+        self.x = x
+        self.y = y
+        self.vely = 0
+        self.started = False
+        self.degree = 0
+        self.rotation = 0
         
     def flap(self) -> None:
         """
@@ -258,26 +391,42 @@ class Bird(Sprite):
         self.rotation = 20
         self.degree = 0
         
-    def collision(self,floor : object,pipe : object) -> bool:
+    def collision(self,floor : object,pipes : tuple) -> bool:
         """
-        Checks for collision of the bird with the floor or pipes
+        Checks for collision of the bird with the floor or any of the pipes
 
         Parameters
         ----------
             - floor: Floor() object
             
-            - pipe: Pipe() object
+            - pipes: tuple of Pipe() objects
             
         Returns
         -------
             Bool
         """
-        # Checks:
-            # - if the bird is touching the floor or gone above the ceiling of the game
-            # - if the bird is in the x range of the pipe when it is not in the gap (space b/w the top pipe and bottom pipe)
-        return (self.y < 0 or self.y > HEIGHT - floor.height - self.height) or \
-                (pipe.x < self.x + self.width < pipe.x + pipe.width and \
-                (self.y < pipe.gap_start or self.y + self.height > pipe.gap_start + PIPE_GAP))
+        # Attributes and globals are read once into locals so that the checks below are plain arithmetic
+        y = self.y
+        bottom = y + self.height
+        
+        # Checks if the bird is touching the floor or gone above the ceiling of the game (once, whatever the number of pipes)
+        if y < 0 or bottom > HEIGHT - floor.height:
+            return True
+        
+        # PIPE_GAP is read here (not bound at definition) as it changes with the difficulty
+        pipe_gap = PIPE_GAP
+        pipe_half = PIPE_THICKNESS * 0.5
+        center_x = self.x + self.half_w
+        reach_x = self.half_w + pipe_half
+        
+        # Checks for every pipe:
+            # - if the bird overlaps the pipe on the x-axis (|distance between centers| < sum of half-widths, so edges that only touch do not collide)
+            # - if the bird is not in the gap (space b/w the top pipe and bottom pipe)
+        for pipe in pipes:
+            gap_start = pipe.gap_start
+            if abs(center_x - (pipe.x + pipe_half)) < reach_x and (y < gap_start or bottom > gap_start + pipe_gap):
+                return True
+        return False
                 
 class Floor(Sprite):
     """
@@ -299,13 +448,14 @@ class Floor(Sprite):
         motion(self):
             Deals with constant movement of the floor on-screen.
 
-        render(self):
+        draw_list(self):
             Deals with rendering (displaying) the floor on-screen
     """
+    __slots__ = ()
     
     # Intialization
     
-    def __init__(self,x: float,y: float,image: Union[str,list]) -> None:
+    def __init__(self,x: float,y: float,image: Union[pygame.Surface,list]) -> None:
         """
         Constructs all the necessary attributes for the floor object.
 
@@ -314,54 +464,55 @@ class Floor(Sprite):
             Inherits x, y and image (height,width) from the Sprite Class
             
         """
-        Sprite.__init__(self,x,y,image)
+        Sprite.__init__(self,x,y,image,image.get_size())
     
     # Methods
     
-    def motion(self) -> None:
+    def motion(self,_speed: float = FLOOR_SPEED) -> None:
         """
         Handles constant motion of the floor (right to left), i.e. constant decrease in x-axis position by a factor of FLOOR_SPEED
 
         Parameters
         ----------
-            None
+            _speed : float
+                - FLOOR_SPEED bound as a local (not meant to be passed)
             
         Returns
         -------
             None
         """
-        self.x -= FLOOR_SPEED 
+        self.x -= _speed
         
-    def render(self,screen) -> None:
+    def draw_list(self) -> list:
         """
-        Displays the floor on-screen
+        Lists the surfaces to display the floor on-screen
         
         Parameters
         ----------
-            screen: pygame screen
+            None
             
         Returns
         -------
-            None
+            list of (pygame surface, position) tuples
         """
-        # Renders 2 back to back images of the floor to allow for seamless motion.
-        screen.blit(self.image,(self.x,self.y))
-        screen.blit(self.image,(self.x + WIDTH,self.y)) 
+        # Renders the strip of 2 back to back images of the floor (see load_sprites()) to allow for seamless motion.
         # If the first image is fully off-screen, the x-position is reset to the original position.
+        return [(self.image,(self.x,self.y))]
     
-    def offscreen(self) -> bool:
+    def offscreen(self,_width: int = WIDTH) -> bool:
         """
         Checks if the floor sprite is off-screen
         
         Parameters
         ----------
-            None
+            _width : int
+                - WIDTH bound as a local (not meant to be passed)
             
         Returns
         -------
             Bool
         """
-        return self.x < -WIDTH
+        return self.x < -_width
         
 class Pipe(Sprite):
     """
@@ -381,11 +532,16 @@ class Pipe(Sprite):
     
         get_flyweight(self):
             This method updates the dictionary of existing flyweights and returns a Pipe object of the particular shared state
+        
+        reset(self,x):
+            Moves the pipe back to the given x-position with a new random gap, so the same object can be reused
             
     """
+    __slots__ = ('gap_start','_shared_state','scored')
+    
     # Intialization
     
-    def __init__(self,x: float,image: Union[str,list],shared_state: str) -> None:
+    def __init__(self,x: float,image: Union[pygame.Surface,list],shared_state: str) -> None:
         """
         Constructs all the necessary attributes for the pipe object.
 
@@ -399,55 +555,78 @@ class Pipe(Sprite):
             _shared_state : str
                 - a state to access pipe object from the flyweight factory (PipeFactory)
             
+            scored : bool
+                - if the bird has already passed this pipe (so the pipe is only scored once)
+            
         """
-        Sprite.__init__(self,x,None,image)
-        self.gap_start = randint(50, HEIGHT - PIPE_GAP - 224 - 50)
+        # The size of the pipe is the size of the top pipe (both pipes have the same size)
+        Sprite.__init__(self,x,None,image,image[0].get_size())
+        self.gap_start = _rng_randrange(50, GAP_START_END)
         self._shared_state = shared_state
+        self.scored = False
     
     # Methods
     
-    def motion(self) -> None:
+    def motion(self,_speed: float = PIPE_SPEED) -> None:
         """
         Handles constant motion of the pipe sprite (right to left), i.e. constant decrease in x-axis position by a factor of PIPE_SPEED
         
         Parameters
         ----------
-            None
+            _speed : float
+                - PIPE_SPEED bound as a local (not meant to be passed)
             
         Returns
         -------
             None
         """
-        self.x -= PIPE_SPEED
+        self.x -= _speed
         
-    def render(self,screen) -> None:
+    def draw_list(self) -> list:
         """
-        Displays the pipe on-screen
+        Lists the surfaces to display the pipe on-screen
         
         Parameters
         ----------
-            screen: pygame screen
+            None
             
         Returns
         -------
-            None
+            list of (pygame surface, position) tuples
         """
-        screen.blit(self.image[0],(self.x,self.gap_start - 640))
-        screen.blit(self.image[1],(self.x,self.gap_start + PIPE_GAP))
+        return [(self.image[0],(self.x,self.gap_start - 640)),(self.image[1],(self.x,self.gap_start + PIPE_GAP))]
         
-    def offscreen(self) -> bool:
+    def offscreen(self,_thickness: int = PIPE_THICKNESS) -> bool:
         """
         Checks if the pipe sprite is off-screen
         
         Parameters
         ----------
-            None
+            _thickness : int
+                - PIPE_THICKNESS bound as a local (not meant to be passed)
             
         Returns
         -------
             Bool
         """
-        return self.x + PIPE_THICKNESS < 0
+        return self.x + _thickness < 0
+    
+    def reset(self,x: float) -> None:
+        """
+        Moves the pipe to a new x-position and re-randomizes its gap, allowing the pipe object to be reused once it goes off-screen
+        
+        Parameters
+        ----------
+            x : int
+                - new x-axis position of the pipe
+            
+        Returns
+        -------
+            None
+        """
+        self.x = x
+        self.gap_start = _rng_randrange(50, GAP_START_END)
+        self.scored = False
         
 class PipeFactory:
     """
@@ -485,9 +664,10 @@ class PipeFactory:
         
     # Methods
     
-    def get_flyweight(self,x: float,image: Union[str,list],shared_state: str) -> object:
+    def get_flyweight(self,x: float,image: Union[pygame.Surface,list],shared_state: str) -> object:
         """
-        Updates dictionary of existing flyweights with Pipe object
+        Returns the Pipe object of the shared state, creating it only if it does not exist yet. 
+        An existing Pipe object is reused and reset to the given x-position.
 
         Parameters
         ----------
@@ -498,8 +678,13 @@ class PipeFactory:
             Pipe object
             
         """
-        self._flyweights[shared_state] = Pipe(x,image,shared_state)
-        return self._flyweights[shared_state]
+        flyweight = self._flyweights.get(shared_state)
+        if flyweight is None:
+            flyweight = Pipe(x,image,shared_state)
+            self._flyweights[shared_state] = flyweight
+        else:
+            flyweight.reset(x)
+        return flyweight
     
 class GameMemento:
     """
@@ -533,6 +718,8 @@ class GameMemento:
             
     """
     
+    __slots__ = ('score','game_over','bird_state','pipe_states','floor_state')
+    
     # Intialization
     
     def __init__(self, score: int, game_over: bool, bird_state: tuple, pipe_states: list, floor_state: int):
@@ -630,11 +817,15 @@ class GameOriginator:
         pipe_states = memento.pipe_states
         floor_state = memento.floor_state
 
-        # Re-initializing Bird, Pipe and Floor objects to original state
-        game.bird = Bird(*bird_state, ['sprites/yellowbird-upflap.png', 'sprites/yellowbird-midflap.png', 'sprites/yellowbird-downflap.png'])
-        game.pipes = [Game.pipefactory.get_flyweight(x,['sprites/pipe-top.png','sprites/pipe-bottom.png'],'pipe') for x in pipe_states]
-        game.floor = Floor(floor_state, HEIGHT - 224, 'sprites/base.png')
-    
+        # Resetting the existing Bird, Pipe and Floor objects to original state (no sprite is rebuilt)
+        game.bird.reset(*bird_state)
+        game.pipes = [Game.pipefactory.get_flyweight(x,PIPE_SURFS,f'pipe{i}') for i,x in enumerate(pipe_states)]
+        game.pipe0, game.pipe1 = game.pipes
+        game.floor.x = floor_state
+
+        # The cached welcome screen shows the score, pipes and floor of the previous session, so it is composed again from the restored state
+        game._welcome_surf = None
+
 class Game:
     """
     The main class that manages the overall game state, i.e. handles the scoring, game over conditions and rendering.
@@ -650,6 +841,9 @@ class Game:
             
         PipeFactory : object
             -  an instance of the PipeFactory class
+            
+        pipe_gaps : dict
+            - the PIPE_GAP of every difficulty (key: difficulty, value: PIPE_GAP)
 
     Instance Attributes
     -------------------
@@ -665,11 +859,14 @@ class Game:
         pipe : list
             - a list of 2 instances of the Pipe class, default set to outside the screen limits.
             
+        pipe0, pipe1 : object
+            - the 2 instances of the Pipe class from the pipes list, kept as attributes for the update loop.
+            
         floor : object
             - an instance of the Floor class, default set to the bottom of the screen.
             
         observer : object
-            - an instance of the Observer class, used to update the score.
+            - an instance of the Observer class (holding this Game), used to update the score.
             
         controls : dict
             - a dictionary of commands with: key -> key pressed by user, 
@@ -678,6 +875,18 @@ class Game:
         difficulty : str
             - a variable that stores the difficulty of the game (difference in PIPE_GAP), determined by command line arguments and default set to 'Easy'
             
+        _difficulty_surf : pygame surface
+            - the 'Mode' text of the current difficulty, rendered once by set_difficulty()
+            
+        _welcome_surf : pygame surface
+            - the welcome screen without the bird, composed once per session by render() (None until then, reset by set_difficulty() and restore_from_memento())
+            
+        _score_cache : dict
+            - score surfaces that have already been rendered (key: score, value: pygame surface)
+            
+        _endgame_cache : dict
+            - game over texts that have already been rendered (key: (score, high score), value: (score surface, high score surface))
+            
     Methods
     -------
         get_instance(): (static method)
@@ -686,12 +895,15 @@ class Game:
         update(self):
             - checks for game over conditions, whether pipe/floor sprite goes offscreen and the constant motion of the sprites
             
-        handle_input(self):
+        handle_input(self,events):
             - checks for user input and performs functions for certains key presses.
             
         render(self,screen):
             - creates surfaces and renders(displays) them on-screen
         
+        set_difficulty(self,difficulty):
+            - sets the difficulty of the game (PIPE_GAP) and renders its 'Mode' text
+        
         endgame(self):
             - deals with endgame rendering and highscore updation(if applicable)
         
@@ -702,7 +914,7 @@ class Game:
     __instance = None
     highscore = 0
     pipefactory = PipeFactory()
-
+    pipe_gaps = {'Easy' : PIPE_GAP, 'Medium' : 200, 'Hard' : 150}
     
     @staticmethod
     def get_instance() -> object:
@@ -740,42 +952,75 @@ class Game:
         self.score = 0
         self.game_over = False
         # Bird Sprite set to left-mid of the screen
-        self.bird = Bird(WIDTH//20,HEIGHT // 2,['sprites/yellowbird-upflap.png','sprites/yellowbird-midflap.png','sprites/yellowbird-downflap.png'])
+        self.bird = Bird(WIDTH//20,HEIGHT // 2,BIRD_SURFS)
         
         # Pipe Sprite set to right of the screen (off-screen)
-        self.pipes = [Game.pipefactory.get_flyweight(WIDTH + WIDTH//2,['sprites/pipe-top.png','sprites/pipe-bottom.png'],'pipe'),Game.pipefactory.get_flyweight(  WIDTH + WIDTH//2+ 340,['sprites/pipe-top.png','sprites/pipe-bottom.png'],'pipe')]
+        self.pipes = [Game.pipefactory.get_flyweight(WIDTH + WIDTH//2,PIPE_SURFS,'pipe0'),Game.pipefactory.get_flyweight(  WIDTH + WIDTH//2+ 340,PIPE_SURFS,'pipe1')]
+        self.pipe0, self.pipe1 = self.pipes
         
         # Floor Sprite set to bottom of the screen
-        self.floor = Floor(0,HEIGHT - 224,'sprites/base.png')
+        self.floor = Floor(0,HEIGHT - 224,FLOOR_SURF)
         
         # Observer initialized
-        self.observer = Observer()
+        self.observer = Observer(self)
+        
+        # Score surfaces already rendered (key: score, value: pygame surface)
+        self._score_cache = {}
+        
+        # Game over texts already rendered (key: (score, high score), value: (score surface, high score surface))
+        self._endgame_cache = {}
         
-        # Controls mapped
-        self.controls = {pygame.K_SPACE : FlapCommand(),pygame.K_UP : FlapCommand(), pygame.K_ESCAPE: ExitCommand()}
+        # Controls mapped (commands are stateless, so both flap keys share the same command object)
+        flap = FlapCommand()
+        self.controls = {pygame.K_SPACE : flap,pygame.K_UP : flap, pygame.K_ESCAPE: ExitCommand()}
 
         
-        # Difficulty of the game (determined by command line arguments)
-        self.difficulty = 'Easy'
-        global PIPE_GAP
+        # Difficulty of the game (determined by command line arguments), None until set_difficulty() is called
+        self.difficulty = None
+        difficulty = 'Easy'
         if len(sys.argv) >= 2:
             if sys.argv[1] == 'h' or sys.argv[1] == 'hard':
-                PIPE_GAP = 150
-                self.difficulty = 'Hard'
+                difficulty = 'Hard'
             elif sys.argv[1] == 'm' or sys.argv[1] == 'med':
-                PIPE_GAP = 200
-                self.difficulty = 'Medium'
+                difficulty = 'Medium'
+        self.set_difficulty(difficulty)
         
         
     # Methods
+    
+    def set_difficulty(self,difficulty: str) -> None:
+        """
+        Sets the difficulty of the game (PIPE_GAP) and renders its 'Mode' text surface once, instead of every frame.
+        
+        Parameters
+        ----------
+            difficulty : str
+                - difficulty of the game ('Easy', 'Medium' or 'Hard')
+            
+        Return
+        ------
+            None
+            
+        """
+        # Nothing to do (and no text to render again) if the difficulty does not change
+        if difficulty == self.difficulty:
+            return
+        global PIPE_GAP, GAP_START_END
+        PIPE_GAP = Game.pipe_gaps[difficulty]
+        GAP_START_END = HEIGHT - PIPE_GAP - 224 - 50 + 1
+        self.difficulty = difficulty
+        self._difficulty_surf = FONT.render(f'Mode  {difficulty}',True,(255,255,255)).convert_alpha()
+        # The welcome screen shows the difficulty, so it has to be composed again
+        self._welcome_surf = None
 
-    def update(self) -> None:
+    def update(self,_width: int = WIDTH,_thickness: int = PIPE_THICKNESS) -> None:
         """
         Checks for game over conditions, if the floor/pipes are offscreen and handles constant motion of all sprites.
         
         Parameters
         ----------
-            None
+            _width, _thickness : int
+                - WIDTH and PIPE_THICKNESS bound as locals (not meant to be passed)
             
         Return
         ------
@@ -790,70 +1035,70 @@ class Game:
         if self.floor.offscreen():
             self.floor.x = 0
 
-        # Maintaining a list of pipes to remove
-        pipes_to_remove = []
+        pipes = (self.pipe0,self.pipe1)
         
         # Iterating through existing pipes
-        for pipe in self.pipes:
+        for pipe in pipes:
             
             # Pipes are constantly moved to the left
             pipe.motion()
             
-            # If collision b/w bird and floor/pipe, game is over and break
-            if self.bird.collision(self.floor,pipe):
-                self.game_over = True
-                HIT_SOUND.play()
-                break
-            
-            # If pipe is offscreen, we add it to pipes to be removed
+            # If pipe is offscreen, the same pipe object is reused, moved back to the right of the screen
             if pipe.offscreen():
-                pipes_to_remove.append(pipe)
-                
-            # If the bird passes half the pipe, we notify the observer and it increments score
-            if pipe.x  + PIPE_THICKNESS // 2 == (self.bird.x):
-                self.observer.update()
+                pipe.reset(_width)
         
-        # Iterating through pipes to remove
-        for pipe in pipes_to_remove:
-            self.pipes.remove(pipe)
-            # adding a new pipe for every pipe removed
-            self.pipes.append(Game.pipefactory.get_flyweight(WIDTH,['sprites/pipe-top.png','sprites/pipe-bottom.png'],'pipe'))
+        # If collision b/w bird and floor/any pipe, game is over (checked once for all pipes)
+        if self.bird.collision(self.floor,pipes):
+            self.game_over = True
+            HIT_SOUND.play()
+        else:
+            # If the left edge of the bird has cleared the pipe (so it can no longer hit it), we notify the observer and it increments score (once per pipe)
+            bird_x = self.bird.x
+            for pipe in pipes:
+                if not pipe.scored and pipe.x + _thickness <= bird_x:
+                    pipe.scored = True
+                    self.observer.update()
             
         # constant motion of the bird (gravity) and floor (right to left)
         self.bird.motion()
         self.floor.motion()
         
         
-    def handle_input(self) -> None:
+    def handle_input(self,events: list) -> None:
         """
         Checks for user input and performs functions for certains key presses.
         
         Parameters
         ----------
-            None
+            events : list
+                - the pygame events of the frame, fetched once by the main loop
             
         Return
         ------
             None
             
         """
-        # Checking events
-        for event in pygame.event.get():
+        controls_get = self.controls.get
+        
+        # Checking events (only window close and key presses are queued, see main())
+        for event in events:
             # If the close button is clicked, window is closed
             if event.type == pygame.QUIT:
+                pygame.mixer.quit()
                 pygame.quit()
-                exit()
+                sys.exit(0)
             # If a key press is in our mapped controls, execute that command
-            elif event.type == pygame.KEYDOWN:
-                command = self.controls.get(event.key)
+            else:
+                command = controls_get(event.key)
                 if command is not None:
-                    command.execute()
+                    command.execute(self)
                     
     
     
-    def render(self,screen,background,logo,press_space,difficulty) -> None:
+    def render(self,screen,background,logo,press_space) -> None:
         """
-        Checks for user input and performs functions for certains key presses.
+        Renders all sprites and texts on-screen. 
+        While the bird is stationary, everything but the bird is static, so the welcome screen is composed once and reused.
         
         Parameters
         ----------
@@ -867,39 +1112,49 @@ class Game:
                 
             press_space : pygame surface
                 - 'press to start' message on welcome screen
-                
-            difficulty : pygame surface
-                - Mode the game is set to (Easy, Medium or Hard)
             
         Return
         ------
             None
             
         """
-        # Creating a surface with updated score
-        score = FONT.render(str(self.score),1,(255,255,255))
+        # Creating a surface with updated score (only rasterized once per score value)
+        score = self._score_cache.get(self.score)
+        if score is None:
+            score = FONT.render(str(self.score),1,(255,255,255)).convert_alpha()
+            self._score_cache[self.score] = score
         
-        # Rendering background
-        screen.blit(background,(0,0))
+        # Everything is collected in a single list of (surface, position) and blitted in one batch
+        # Rendering background (only the part above the floor, the rest would be covered by the floor anyway)
+        draws = [(background,(0,0),(0,0,WIDTH,self.floor.y))]
         
         # Rendering pipe
         for pipe in self.pipes:
-            pipe.render(screen)
+            draws += pipe.draw_list()
             
-        # Rendering floor and bird
-        self.floor.render(screen)
-        self.bird.render(screen)
+        # Rendering floor
+        draws += self.floor.draw_list()
         
-        # Rendering score
-        screen.blit(score,((WIDTH-score.get_width())//2,50))
-
-        # If bird is stationary (welcome screen), display logo and press space message
+        # If bird is stationary (welcome screen), the scene with the score, logo and press space message is composed once into a single surface,
+        # then only that surface and the bird (which does not overlap any of the texts) are rendered
         if not self.bird.started:
-            screen.blit(logo,(0,0))
-            screen.blit(difficulty,((WIDTH - difficulty.get_width())//2,200))
-            screen.blit(press_space,((WIDTH - press_space.get_width())//2,HEIGHT-self.floor.height - press_space.get_height()))
-            
-        pygame.display.update()
+            if self._welcome_surf is None:
+                difficulty = self._difficulty_surf
+                draws.append((score,((WIDTH-score.get_width())//2,50)))
+                draws.append((logo,(0,0)))
+                draws.append((difficulty,((WIDTH - difficulty.get_width())//2,200)))
+                draws.append((press_space,((WIDTH - press_space.get_width())//2,HEIGHT-self.floor.height - press_space.get_height())))
+                self._welcome_surf = pygame.Surface((WIDTH,HEIGHT)).convert()
+                self._welcome_surf.blits(draws,False)
+            draws = [(self._welcome_surf,(0,0))]
+            draws += self.bird.draw_list()
+        else:
+            # Rendering bird and score
+            draws += self.bird.draw_list()
+            draws.append((score,((WIDTH-score.get_width())//2,50)))
+        
+        screen.blits(draws,False)
+        pygame.display.flip()
             
     def endgame(self,screen) -> None:
         """
@@ -921,17 +1176,20 @@ class Game:
         if Game.highscore < self.score:
             Game.highscore = self.score
         
-        # Creating Game Over, Score and Highscore surfaces
-        over = pygame.transform.scale2x(pygame.image.load('sprites/gameover.png').convert_alpha())
-        score = FONT.render(f'Score  {str(self.score)}',1,(255,255,255))
-        high = FONT.render(f'High Score  {str(Game.highscore)}',1,(255,255,255))
+        # Creating Game Over, Score and Highscore surfaces (text only rasterized once per score/high score pair)
+        over = GAMEOVER_SURF
+        texts = self._endgame_cache.get((self.score,Game.highscore))
+        if texts is None:
+            texts = (FONT.render(f'Score  {str(self.score)}',1,(255,255,255)).convert_alpha(),FONT.render(f'High Score  {str(Game.highscore)}',1,(255,255,255)).convert_alpha())
+            self._endgame_cache[(self.score,Game.highscore)] = texts
+        score, high = texts
         
-        # Rendering the above surfaces on-screen
-        screen.blit(over,((WIDTH - over.get_width())//2,HEIGHT//2 - 100)) 
-        screen.blit(score,((WIDTH - score.get_width())//2,HEIGHT//2))
-        screen.blit(high,((WIDTH - high.get_width())//2,HEIGHT//2 + 50))
+        # Rendering the above surfaces on-screen (in a single batch)
+        screen.blits([(over,((WIDTH - over.get_width())//2,HEIGHT//2 - 100)),
+                      (score,((WIDTH - score.get_width())//2,HEIGHT//2)),
+                      (high,((WIDTH - high.get_width())//2,HEIGHT//2 + 50))],False)
         
-        pygame.display.update()
+        pygame.display.flip()
         
         
 class Command:
@@ -949,13 +1207,13 @@ class Command:
     Methods
     -------
     
-        execute(self):
-            - command to be executed
+        execute(self,game):
+            - command to be executed on the game
             
     """
     # Methods
     
-    def execute(self) -> None:
+    def execute(self,game: object) -> None:
         pass
     
 class FlapCommand(Command):
@@ -974,26 +1232,26 @@ class FlapCommand(Command):
     Methods
     -------
     
-        execute(self,bird):
+        execute(self,game):
             - executes a bird flap
             
     """
     # Methods
     
-    def execute(self) -> None:
+    def execute(self,game: object) -> None:
         """
         Executes the bird flap and plays audio for every flap.
         
         Parameters
         ----------
-            None
+            game : object
+                - the Game instance whose bird flaps
             
         Return
         ------
             None
             
         """
-        game = Game.get_instance()
         # Set started argument of bird to True
         game.bird.started = True
         
@@ -1001,7 +1259,7 @@ class FlapCommand(Command):
         game.bird.flap()
         
         # Play audio chime
-        FLAP_SOUND.play()
+        FLAP_CHANNEL.play(FLAP_SOUND)
         
 class ExitCommand(Command):
     """
@@ -1019,64 +1277,100 @@ class ExitCommand(Command):
     Methods
     -------
     
-        execute(self,bird):
+        execute(self,game):
             - Closes game
             
     """
     # Methods
-    def execute(self):
+    def execute(self,game: object) -> None:
         """
-        Executes the pygame.quit() function to exit the game.
+        Executes the pygame.quit() and sys.exit() functions to exit the game.
     
         Parameters
         ----------
-            None
+            game : object
+                - the Game instance (unused)
         
         Return
         ------
             None
         
         """
+        # The mixer is shut down first so the audio thread winds down before the rest of pygame
+        pygame.mixer.quit()
         pygame.quit()
-        exit()
+        sys.exit(0)
         
         
 def main():
     """
-    Initializes the pygame window and runs the main loop to display the game
+    Initializes the pygame window and the welcome screen surfaces once, then runs the main loop to display the game, restarting it after every game over
     """
-    # Creates the pygame window
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    # Creates the pygame window (presentation synced to the display refresh, clock.tick(FPS) still caps the frame rate where vsync is unavailable)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED | pygame.DOUBLEBUF, vsync=1)
     pygame.display.set_caption("Flappy Bird for Antoine")
+    # Only window close and key presses are queued: every event type is allowed by default, so all types are blocked first,
+    # otherwise the events that are never fetched (mouse motion, key releases, etc.) would pile up until the queue is full
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT,pygame.KEYDOWN])
+    # Loads the sprite surfaces shared by all sprites
+    load_sprites()
     checkpoint_handler = GameOriginator()
     # Creates the game instance
     game = Game.get_instance()
     
-    # Set the welcome screen surfaces
-    background=pygame.transform.scale2x(pygame.image.load('sprites/background-night.png'))
+    # Set the welcome screen surfaces (converted to the display format once, so blitting them needs no pixel conversion)
+    background=pygame.transform.scale2x(pygame.image.load('sprites/background-night.png').convert())
     logo = pygame.transform.scale(pygame.image.load('sprites/flappy_logo.png').convert_alpha(),(WIDTH,224))
-    press_space = FONT.render('Press SPACE',1,(255,255,255))
-    difficulty = FONT.render(f'Mode  {game.difficulty}',1,(255,255,255))
+    press_space = FONT.render('Press SPACE',1,(255,255,255)).convert_alpha()
     
     # Creates a memento of the initial state of the game
+    # (snapshot taken only once, before the first session, never per frame: every restart restores this same memento)
     start_state = checkpoint_handler.create_memento()
     
     # Sets the clock
     clock = pygame.time.Clock()
+    
+    # Methods called every frame are bound to locals once (the game, its bird and the clock are the same objects for every session)
+    game_render = game.render
+    game_handle_input = game.handle_input
+    game_update = game.update
+    clock_tick = clock.tick
+    bird = game.bird
 
-    # Main loop
+    # Session loop: every game (session) is played in the main loop, then the game is restored and started again on its own
     while True:
-        game.render(screen,background,logo,press_space,difficulty)              # Renders all sprites on-screen
-        game.handle_input()              # Checks for any input
-        if game.bird.started:            # Starts the checks and updation of the sprites if the bird has started moving
-            game.update()
-        clock.tick(FPS)
-        if game.game_over:               # If the game is over, 
-            game.endgame(screen)          # endgame method is called, a delay of 3 seconds is set and the game is restored back to its intial state
-            pygame.time.delay(3000)
-            checkpoint_handler.restore_from_memento(start_state)
-            break
-    main()                               # The main loop is started again, allowing the game to start again on its own
+        # Time elapsed that has not been simulated yet (in seconds), measured with perf_counter() rather than the whole milliseconds of clock.tick()
+        dt_accum = 0.0
+        last_time = perf_counter()
+        
+        # Main loop
+        while True:
+            game_render(screen,background,logo,press_space)              # Renders all sprites on-screen
+            game_handle_input(pygame.event.get((pygame.QUIT,pygame.KEYDOWN)))   # Fetches the events of the frame once and checks for any input
+            clock_tick(FPS)                  # Caps the frame rate (when vsync is not active)
+            now = perf_counter()
+            frame_time = now - last_time
+            last_time = now
+            steps = round(frame_time / FIXED_DT)
+            if steps and abs(frame_time - steps * FIXED_DT) < SNAP_TOLERANCE:   # Snaps a frame that is close to a whole number of steps
+                frame_time = steps * FIXED_DT
+            dt_accum = min(dt_accum + frame_time, MAX_FRAME_TIME)
+            if bird.started:                 # Starts the checks and updation of the sprites if the bird has started moving
+                while dt_accum >= FIXED_DT:  # The game is updated in fixed steps, as many as the time elapsed allows
+                    game_update()
+                    dt_accum -= FIXED_DT
+            else:
+                dt_accum = 0.0
+            if game.game_over:               # If the game is over, 
+                game.endgame(screen)          # endgame method is called, a wait of 3 seconds is set and the game is restored back to its intial state
+                wait_end = pygame.time.get_ticks() + 3000
+                while pygame.time.get_ticks() < wait_end:   # The game over screen keeps being presented while waiting, so the window keeps responding
+                    game_handle_input(pygame.event.get(pygame.QUIT))   # Only closing the window is handled (key presses stay queued)
+                    pygame.display.flip()
+                    clock_tick(FPS)
+                checkpoint_handler.restore_from_memento(start_state)
+                break
     
     
 class Observer:
@@ -1090,7 +1384,8 @@ class Observer:
 
     Instance Attributes
     -------------------
-        None
+        _game : object
+            - the Game instance whose score is updated
         
     Methods
     -------
@@ -1099,16 +1394,28 @@ class Observer:
             - increases the game score by 1 and plays an audio chime
             
     """
+    # Intialization
+    
+    def __init__(self,game: object) -> None:
+        """
+        Constructs all the necessary attributes for the observer object.
+
+        Parameters
+        ----------
+            game : object
+                - the Game instance whose score is updated (kept, so get_instance() is not needed on every update)
+            
+        """
+        self._game = game
+    
     # Methods
     
     def update(self) -> None:
-        game = Game.get_instance()
-        
         # Increment game score by 1
-        game.score += 1
+        self._game.score += 1
         
         # Play audio chime
-        POINT_SOUND.play()
+        POINT_CHANNEL.play(POINT_SOUND)
          
 if __name__ == '__main__':
     main()
\ No newline at end of file